@@ -10,7 +10,11 @@ import argparse
 import json
 import sys
 import os
-from sklearn.cluster import KMeans
+import re
+import socket
+import struct
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from datetime import datetime
@@ -23,63 +27,120 @@ try:
     # Use Agg backend for non-interactive plotting (works without display)
     matplotlib.use('Agg')
     import matplotlib.pyplot as plt
-    import seaborn as sns
     MATPLOTLIB_AVAILABLE = True
     print("📈 Matplotlib available for graph generation (using Agg backend)")
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
     print("⚠️  Matplotlib not available - graphs will be skipped")
 
+# pyarrow provides a native CSV reader for the lenient fallback path
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# orjson serializes JSON exports natively; fall back to the stdlib encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def ipv4_to_u32(addresses):
+    """Convert a Series of dotted-quad strings to uint32 (0 for non-IPv4 values)"""
+    # Parse each distinct address once and broadcast back through the codes
+    codes, uniques = pd.factorize(addresses)
+    values = np.zeros(len(uniques) + 1, dtype=np.uint32)
+    for i, addr in enumerate(uniques):
+        try:
+            values[i] = struct.unpack('!I', socket.inet_pton(socket.AF_INET, str(addr)))[0]
+        except (OSError, ValueError):
+            pass
+    # Missing values get code -1, which indexes the trailing zero
+    return values[codes]
+
+def is_private_ipv4(ips):
+    """Return a boolean mask of addresses inside the RFC1918 private ranges"""
+    return (((ips & 0xFF000000) == 0x0A000000) |
+            ((ips & 0xFFF00000) == 0xAC100000) |
+            ((ips & 0xFFFF0000) == 0xC0A80000))
+
+def assigned_center_scores(points, centers, labels):
+    """Distance from each point to its assigned centroid, min-max normalized to 0-1"""
+    # Work in place on the gathered centers and the score vector to avoid temporaries
+    diffs = centers[labels]
+    np.subtract(points, diffs, out=diffs)
+    scores = np.einsum('ij,ij->i', diffs, diffs)
+    np.sqrt(scores, out=scores)
+    
+    if len(scores) > 1:
+        score_min, score_max = np.min(scores), np.max(scores)
+        if score_max > score_min:
+            np.subtract(scores, score_min, out=scores)
+            np.divide(scores, score_max - score_min, out=scores)
+    return scores
+
+# Info-field patterns, compiled once at import
+PORT_INFO_RE = re.compile(r'\d+ →')
+ERROR_INFO_RE = re.compile(r'error|failed|timeout|unreachable', re.IGNORECASE)
+
+# Captures larger than this are clustered with MiniBatchKMeans
+MINIBATCH_THRESHOLD = 50000
+
+# Exports larger than this are read in chunks of CSV_CHUNK_SIZE rows
+CHUNKED_READ_BYTES = 512 * 1024 * 1024
+CSV_CHUNK_SIZE = 200000
+
+# Only the Wireshark columns used for features are read; text columns skip type inference
+CSV_COLUMNS = {'No.', 'Time', 'Source', 'Destination', 'Protocol', 'Length', 'Info'}
+CSV_DTYPES = {'Source': str, 'Destination': str, 'Protocol': str, 'Info': str}
+
+# Above this many packets, per-packet features are extracted on a thread pool
+PARALLEL_EXTRACT_THRESHOLD = 100000
+
+# Feature column order used for clustering and plots
+FEATURE_COLUMNS = [
+    'length', 'protocol_encoded', 'time_normalized', 'time_delta',
+    'src_local', 'dst_local', 'has_port_info', 'has_error',
+    'is_tcp', 'is_udp', 'is_http', 'is_dns',
+    'size_small', 'size_medium', 'size_large'
+]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+# Maximum number of packets drawn in scatter plots, and the resolution graphs are saved at
+PLOT_SAMPLE_SIZE = 50000
+PLOT_DPI = 120
+
+def sample_indices(n, max_size, seed=42):
+    """Sorted random row indices (at most max_size) for plotting large captures"""
+    if n <= max_size:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, size=max_size, replace=False))
+
 class WiresharkKmeansAnalyzer:
     def __init__(self, n_clusters=5):
         self.n_clusters = n_clusters
         self.scaler = StandardScaler()
         self.kmeans = None
         self.features = None
+        self.features_scaled = None
         self.cluster_labels = None
         self.anomaly_scores = None
+        self.anomaly_threshold = None
         
     def process_wireshark_csv(self, csv_file):
         """Process Wireshark CSV export with improved parsing"""
         try:
             # Read CSV with flexible parsing to handle complex Info fields
-            df = pd.read_csv(csv_file, low_memory=False, quoting=1, escapechar='\\')
+            df = pd.read_csv(csv_file, low_memory=False, quoting=1, escapechar='\\',
+                             usecols=lambda col: col in CSV_COLUMNS, dtype=CSV_DTYPES)
             
             print(f"Loaded CSV with {len(df)} rows and {len(df.columns)} columns")
             print(f"Column names: {list(df.columns)}")
             
-            # Handle different CSV export formats from Wireshark
-            # Common column names in Wireshark CSV exports
-            column_mappings = {
-                'No.': 'frame_number',
-                'Time': 'timestamp', 
-                'Source': 'src_ip',
-                'Destination': 'dst_ip',
-                'Protocol': 'protocol',
-                'Length': 'length',
-                'Info': 'info'
-            }
-            
-            # Rename columns if they exist
-            for old_name, new_name in column_mappings.items():
-                if old_name in df.columns:
-                    df = df.rename(columns={old_name: new_name})
-            
-            # Fill missing values with appropriate defaults
-            if 'frame_number' not in df.columns:
-                df['frame_number'] = range(1, len(df) + 1)
-            if 'timestamp' not in df.columns:
-                df['timestamp'] = range(len(df))
-            
-            df = df.fillna({
-                'src_ip': 'unknown',
-                'dst_ip': 'unknown', 
-                'protocol': 'unknown',
-                'length': 0,
-                'info': ''
-            })
-            
-            return df
+            return self._normalize_columns(df)
             
         except Exception as e:
             print(f"Error processing CSV with pandas: {e}")
@@ -87,129 +148,194 @@ class WiresharkKmeansAnalyzer:
             
             # Alternative parsing method for problematic CSV files
             try:
-                lines = []
-                with open(csv_file, 'r') as f:
-                    header = f.readline().strip().split(',')
-                    for line_num, line in enumerate(f, 2):
-                        # Simple parsing that handles quoted fields
-                        fields = []
-                        current_field = ""
-                        in_quotes = False
-                        
-                        for char in line:
-                            if char == '"' and not in_quotes:
-                                in_quotes = True
-                            elif char == '"' and in_quotes:
-                                in_quotes = False
-                            elif char == ',' and not in_quotes:
-                                fields.append(current_field.strip('"'))
-                                current_field = ""
-                            else:
-                                current_field += char
-                        
-                        # Add the last field
-                        fields.append(current_field.strip().strip('"'))
-                        
-                        # Pad or truncate to match header length
-                        while len(fields) < len(header):
-                            fields.append("")
-                        fields = fields[:len(header)]
-                        
-                        lines.append(fields)
-                
-                # Create DataFrame from parsed data
-                df = pd.DataFrame(lines, columns=header)
+                df = self._read_csv_fallback(csv_file)
                 
                 print(f"Alternative parsing successful: {len(df)} rows")
                 
-                # Apply column mappings
-                column_mappings = {
-                    'No.': 'frame_number',
-                    'Time': 'timestamp', 
-                    'Source': 'src_ip',
-                    'Destination': 'dst_ip',
-                    'Protocol': 'protocol',
-                    'Length': 'length',
-                    'Info': 'info'
-                }
-                
-                for old_name, new_name in column_mappings.items():
-                    if old_name in df.columns:
-                        df = df.rename(columns={old_name: new_name})
-                
-                # Fill missing values
-                if 'frame_number' not in df.columns:
-                    df['frame_number'] = range(1, len(df) + 1)
-                if 'timestamp' not in df.columns:
-                    df['timestamp'] = range(len(df))
-                    
-                df = df.fillna({
-                    'src_ip': 'unknown',
-                    'dst_ip': 'unknown', 
-                    'protocol': 'unknown',
-                    'length': 0,
-                    'info': ''
-                })
-                
-                return df
+                return self._normalize_columns(df)
                 
             except Exception as e2:
                 print(f"Alternative parsing also failed: {e2}")
                 return None
     
+    def _read_csv_fallback(self, csv_file):
+        """Lenient CSV read for exports the default pandas parser rejects"""
+        if PYARROW_AVAILABLE:
+            # Native multi-threaded tokenizer for exports that are well-formed but trip the C parser
+            try:
+                table = pacsv.read_csv(
+                    csv_file,
+                    parse_options=pacsv.ParseOptions(
+                        quote_char='"',
+                        escape_char='\\',
+                        newlines_in_values=True
+                    )
+                )
+            except pa.ArrowInvalid:
+                # Malformed rows: keep them through the python engine below instead of dropping them
+                table = None
+            
+            # Undecodable text comes back as binary columns; the python engine raises on it instead
+            if table is not None and not any(pa.types.is_binary(field.type) for field in table.schema):
+                return table.to_pandas()
+        
+        # Otherwise let the python engine pad short rows and truncate long ones
+        return pd.read_csv(
+            csv_file,
+            engine='python',
+            escapechar='\\',
+            dtype=str,
+            keep_default_na=False,
+            on_bad_lines=lambda fields: fields
+        )
+    
+    def _normalize_columns(self, df, start=0):
+        """Map Wireshark column names to internal names and fill missing values"""
+        # Handle different CSV export formats from Wireshark
+        # Common column names in Wireshark CSV exports
+        column_mappings = {
+            'No.': 'frame_number',
+            'Time': 'timestamp', 
+            'Source': 'src_ip',
+            'Destination': 'dst_ip',
+            'Protocol': 'protocol',
+            'Length': 'length',
+            'Info': 'info'
+        }
+        
+        # Rename columns if they exist
+        df = df.rename(columns={old: new for old, new in column_mappings.items() if old in df.columns})
+        
+        # Fill missing values with appropriate defaults
+        if 'frame_number' not in df.columns:
+            df['frame_number'] = range(start + 1, start + len(df) + 1)
+        if 'timestamp' not in df.columns:
+            df['timestamp'] = range(start, start + len(df))
+        
+        # Only columns that actually contain gaps are filled; clean exports skip the pass
+        defaults = {
+            'src_ip': 'unknown',
+            'dst_ip': 'unknown', 
+            'protocol': 'unknown',
+            'length': 0,
+            'info': ''
+        }
+        missing = {col: value for col, value in defaults.items() if col in df.columns and df[col].hasnans}
+        if missing:
+            df = df.fillna(missing)
+        
+        return df
+    
     def extract_features(self, df):
         """Extract features from processed DataFrame"""
-        features = pd.DataFrame()
-        
-        # Basic packet features
-        features['length'] = pd.to_numeric(df['length'], errors='coerce').fillna(0)
+        n_jobs = os.cpu_count() or 1
+        if n_jobs > 1 and len(df) > PARALLEL_EXTRACT_THRESHOLD:
+            # Per-packet features are independent across rows; the pandas/NumPy kernels
+            # release the GIL, so row slices are processed on a thread pool
+            bounds = np.linspace(0, len(df), n_jobs + 1, dtype=int)
+            packet_features = np.concatenate(Parallel(n_jobs=n_jobs, prefer='threads')(
+                delayed(self._extract_packet_features)(df.iloc[start:end])
+                for start, end in zip(bounds[:-1], bounds[1:])
+            ))
+        else:
+            packet_features = self._extract_packet_features(df)
         
-        # Protocol encoding
-        protocol_counts = df['protocol'].value_counts()
-        print(f"Top protocols: {protocol_counts.head()}")
+        timestamps = df['timestamp'] if 'timestamp' in df.columns else None
+        return self._add_capture_features(packet_features, df['protocol'], timestamps)
+    
+    def extract_features_chunked(self, csv_file, chunksize=CSV_CHUNK_SIZE):
+        """Extract features from a large CSV export without holding every raw column in memory.
+        
+        Per-packet features are computed chunk by chunk and the raw string columns are
+        dropped straight away; only protocol and timestamp are kept for the capture-wide
+        features. Returns None if the file cannot be streamed with the default parser.
+        """
+        packet_parts, protocols, timestamps = [], [], []
+        try:
+            reader = pd.read_csv(csv_file, low_memory=False, quoting=1, escapechar='\\',
+                                 usecols=lambda col: col in CSV_COLUMNS, dtype=CSV_DTYPES, chunksize=chunksize)
+            packets_read = 0
+            for chunk in reader:
+                chunk = self._normalize_columns(chunk, start=packets_read)
+                packets_read += len(chunk)
+                packet_parts.append(self._extract_packet_features(chunk))
+                protocols.append(chunk['protocol'])
+                timestamps.append(chunk['timestamp'])
+                print(f"Processed {packets_read} packets...")
+        except Exception as e:
+            print(f"Chunked CSV processing failed: {e}")
+            return None
         
-        protocol_map = {proto: idx for idx, proto in enumerate(protocol_counts.index[:20])}
-        features['protocol_encoded'] = df['protocol'].map(protocol_map).fillna(999)
+        if not packet_parts:
+            print("Error: CSV file is empty")
+            return None
         
-        # Time-based features
-        if 'timestamp' in df.columns:
-            time_vals = pd.to_numeric(df['timestamp'], errors='coerce').fillna(0)
-            features['time_normalized'] = (time_vals - time_vals.min()) / max(time_vals.max() - time_vals.min(), 1)
-            features['time_delta'] = time_vals.diff().fillna(0)
-        else:
-            features['time_normalized'] = 0
-            features['time_delta'] = 0
+        return self._add_capture_features(
+            np.concatenate(packet_parts),
+            pd.concat(protocols, ignore_index=True),
+            pd.concat(timestamps, ignore_index=True)
+        )
+    
+    def _extract_packet_features(self, df):
+        """Fill the per-packet feature columns of a new float32 matrix (capture-wide columns are left at 0)"""
+        features = np.zeros((len(df), len(FEATURE_COLUMNS)), dtype=np.float32)
         
-        # IP address features
-        features['src_local'] = df['src_ip'].str.contains(
-            r'^(192\.168\.|10\.|172\.(1[6-9]|2[0-9]|3[01])\.)', 
-            na=False, regex=True
-        ).astype(int)
+        # Basic packet features
+        length = pd.to_numeric(df['length'], errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+        features[:, FEATURE_INDEX['length']] = length
         
-        features['dst_local'] = df['dst_ip'].str.contains(
-            r'^(192\.168\.|10\.|172\.(1[6-9]|2[0-9]|3[01])\.)', 
-            na=False, regex=True
-        ).astype(int)
+        # IP address features (RFC1918 ranges via integer masks)
+        features[:, FEATURE_INDEX['src_local']] = is_private_ipv4(ipv4_to_u32(df['src_ip']))
+        features[:, FEATURE_INDEX['dst_local']] = is_private_ipv4(ipv4_to_u32(df['dst_ip']))
         
         # Port extraction from info field
-        features['has_port_info'] = df['info'].str.contains(r'\d+ →', na=False).astype(int)
+        features[:, FEATURE_INDEX['has_port_info']] = df['info'].str.contains(PORT_INFO_RE, na=False)
         
         # Error and flag indicators
-        features['has_error'] = df['info'].str.contains(
-            r'error|failed|timeout|unreachable', 
-            case=False, na=False
-        ).astype(int)
-        
-        # Protocol-specific features
-        features['is_tcp'] = (df['protocol'].str.upper() == 'TCP').astype(int)
-        features['is_udp'] = (df['protocol'].str.upper() == 'UDP').astype(int)
-        features['is_http'] = df['protocol'].str.contains('HTTP', na=False).astype(int)
-        features['is_dns'] = (df['protocol'].str.upper() == 'DNS').astype(int)
-        
-        # Packet size categories
-        features['size_small'] = (features['length'] < 100).astype(int)
-        features['size_medium'] = ((features['length'] >= 100) & (features['length'] < 1000)).astype(int)
-        features['size_large'] = (features['length'] >= 1000).astype(int)
+        features[:, FEATURE_INDEX['has_error']] = df['info'].str.contains(ERROR_INFO_RE, na=False)
+        
+        # Protocol-specific features, evaluated once per distinct protocol and broadcast
+        # through the integer codes (the extra last row covers missing protocols)
+        protocol_codes, protocols = pd.factorize(df['protocol'])
+        protocols = protocols.astype(str)
+        protocols_upper = protocols.str.upper()
+        protocol_flags = np.zeros((len(protocols) + 1, 4), dtype=np.float32)
+        protocol_flags[:-1, 0] = protocols_upper == 'TCP'
+        protocol_flags[:-1, 1] = protocols_upper == 'UDP'
+        protocol_flags[:-1, 2] = protocols.str.contains('HTTP')
+        protocol_flags[:-1, 3] = protocols_upper == 'DNS'
+        protocol_start = FEATURE_INDEX['is_tcp']
+        features[:, protocol_start:protocol_start + 4] = protocol_flags[protocol_codes]
+        
+        # Packet size categories (<100, 100-999, >=1000 bytes) bucketed in one pass, then one-hot encoded
+        size_buckets = np.digitize(length, [100, 1000])
+        size_start = FEATURE_INDEX['size_small']
+        features[:, size_start:size_start + 3] = np.eye(3, dtype=np.float32)[size_buckets]
+        
+        return features
+    
+    def _add_capture_features(self, features, protocol, timestamps):
+        """Fill the features that depend on the whole capture (protocol ranks, timing)"""
+        # Protocol encoding: the 20 most common protocols get their frequency rank, others 999.
+        # Ranks are looked up through integer codes rather than a per-row dict map.
+        protocol_codes, protocols = pd.factorize(protocol)
+        counts = np.bincount(protocol_codes[protocol_codes >= 0], minlength=len(protocols))
+        order = np.argsort(-counts, kind='stable')
+        protocol_counts = pd.Series(counts[order], index=pd.Index(protocols[order], name='protocol'), name='count')
+        print(f"Top protocols: {protocol_counts.head()}")
+        
+        protocol_rank = np.full(len(protocols) + 1, 999, dtype=np.int16)
+        protocol_rank[order[:20]] = np.arange(min(len(order), 20))
+        features[:, FEATURE_INDEX['protocol_encoded']] = protocol_rank[protocol_codes]
+        
+        # Time-based features (derived in float64 so absolute timestamps keep precision)
+        if timestamps is not None:
+            time_vals = pd.to_numeric(timestamps, errors='coerce').fillna(0)
+            features[:, FEATURE_INDEX['time_normalized']] = (time_vals - time_vals.min()) / max(time_vals.max() - time_vals.min(), 1)
+            features[:, FEATURE_INDEX['time_delta']] = time_vals.diff().fillna(0)
+        
+        # Wrap the single contiguous matrix without copying; plots need the column names
+        features = pd.DataFrame(features, columns=FEATURE_COLUMNS, copy=False)
         
         print(f"Extracted {len(features.columns)} features from {len(features)} packets")
         print(f"Feature columns: {list(features.columns)}")
@@ -221,24 +347,31 @@ class WiresharkKmeansAnalyzer:
         if len(features) < self.n_clusters:
             raise ValueError(f"Not enough data points ({len(features)}) for {self.n_clusters} clusters")
         
-        # Scale features
-        features_scaled = self.scaler.fit_transform(features)
+        # Scale features; float32 halves the memory streamed through the K-means distance kernel
+        features_scaled = np.ascontiguousarray(self.scaler.fit_transform(features), dtype=np.float32)
         
-        # Perform K-means clustering
-        self.kmeans = KMeans(n_clusters=self.n_clusters, random_state=42, n_init=10)
+        # Perform K-means clustering (mini-batch updates for large captures)
+        if len(features_scaled) > MINIBATCH_THRESHOLD:
+            print(f"Using MiniBatchKMeans for {len(features_scaled)} packets")
+            # Keep at least ~256 samples per centroid in each mini-batch for large cluster counts
+            self.kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, random_state=42, n_init=3,
+                                          batch_size=max(4096, 256 * self.n_clusters),
+                                          reassignment_ratio=0.01)
+        else:
+            self.kmeans = KMeans(n_clusters=self.n_clusters, random_state=42, n_init=10)
         self.cluster_labels = self.kmeans.fit_predict(features_scaled)
         
-        # Calculate anomaly scores (distance to nearest cluster center)
-        distances = self.kmeans.transform(features_scaled)
-        self.anomaly_scores = np.min(distances, axis=1)
+        # Calculate anomaly scores (distance to nearest cluster center, normalized to 0-1).
+        # Fitted labels are the nearest centers, so only the assigned distance is computed
+        # rather than the full packets x clusters matrix from KMeans.transform.
+        self.anomaly_scores = assigned_center_scores(features_scaled, self.kmeans.cluster_centers_,
+                                                     self.cluster_labels)
         
-        # Normalize anomaly scores to 0-1 range
-        if len(self.anomaly_scores) > 1:
-            score_min, score_max = np.min(self.anomaly_scores), np.max(self.anomaly_scores)
-            if score_max > score_min:
-                self.anomaly_scores = (self.anomaly_scores - score_min) / (score_max - score_min)
+        # 90th-percentile anomaly threshold, computed once and shared by summary, plots and export
+        self.anomaly_threshold = np.percentile(self.anomaly_scores, 90)
         
         self.features = features
+        self.features_scaled = features_scaled
         
         return {
             'cluster_labels': self.cluster_labels,
@@ -246,6 +379,13 @@ class WiresharkKmeansAnalyzer:
             'cluster_centers': self.kmeans.cluster_centers_
         }
     
+    def analyze(self, df):
+        """Convenience wrapper: extract_features followed by perform_analysis"""
+        print("Extracting features...")
+        features = self.extract_features(df)
+        print(f"Performing K-means analysis with {self.n_clusters} clusters...")
+        return self.perform_analysis(features)
+    
     def get_cluster_summary(self):
         """Generate cluster analysis summary"""
         if self.cluster_labels is None:
@@ -258,8 +398,8 @@ class WiresharkKmeansAnalyzer:
             'anomaly_statistics': {
                 'mean_score': float(np.mean(self.anomaly_scores)),
                 'std_score': float(np.std(self.anomaly_scores)),
-                'high_anomaly_threshold': float(np.percentile(self.anomaly_scores, 90)),
-                'high_anomaly_count': int(np.sum(self.anomaly_scores > np.percentile(self.anomaly_scores, 90)))
+                'high_anomaly_threshold': float(self.anomaly_threshold),
+                'high_anomaly_count': int(np.sum(self.anomaly_scores > self.anomaly_threshold))
             }
         }
         
@@ -294,7 +434,6 @@ class WiresharkKmeansAnalyzer:
         try:
             # Set up the plotting style
             plt.style.use('default')
-            sns.set_palette("husl")
             
             # 1. Cluster Distribution Plot
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
@@ -316,7 +455,7 @@ class WiresharkKmeansAnalyzer:
             
             # Anomaly score distribution
             ax2.hist(self.anomaly_scores, bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-            ax2.axvline(np.percentile(self.anomaly_scores, 90), color='red', linestyle='--', 
+            ax2.axvline(self.anomaly_threshold, color='red', linestyle='--', 
                        label=f'90th Percentile (Anomaly Threshold)')
             ax2.set_title('Anomaly Score Distribution', fontsize=14, fontweight='bold')
             ax2.set_xlabel('Anomaly Score')
@@ -326,7 +465,7 @@ class WiresharkKmeansAnalyzer:
             
             plt.tight_layout()
             cluster_dist_file = os.path.join(output_dir, 'kmeans_cluster_distribution.png')
-            plt.savefig(cluster_dist_file, dpi=300, bbox_inches='tight')
+            plt.savefig(cluster_dist_file, dpi=PLOT_DPI, bbox_inches='tight')
             generated_files.append(cluster_dist_file)
             print(f"📊 Generated cluster distribution plot: {cluster_dist_file}")
             
@@ -337,15 +476,16 @@ class WiresharkKmeansAnalyzer:
             
             # 2. PCA Visualization (2D projection of clusters)
             if len(self.features.columns) >= 2:
-                # Reduce dimensionality to 2D for visualization
-                features_scaled = self.scaler.transform(self.features)
-                pca = PCA(n_components=2)
-                features_2d = pca.fit_transform(features_scaled)
+                # Reduce dimensionality to 2D for visualization (reusing the scaled matrix).
+                # Large captures are subsampled; the scatter cannot show more points anyway.
+                plot_idx = sample_indices(len(self.features_scaled), PLOT_SAMPLE_SIZE)
+                pca = PCA(n_components=2, svd_solver='randomized', random_state=42)
+                features_2d = pca.fit_transform(self.features_scaled[plot_idx])
                 
                 plt.figure(figsize=(12, 8))
                 scatter = plt.scatter(features_2d[:, 0], features_2d[:, 1], 
-                                   c=self.cluster_labels, cmap='viridis', 
-                                   alpha=0.6, s=50)
+                                   c=self.cluster_labels[plot_idx], cmap='viridis', 
+                                   alpha=0.6, s=50, rasterized=True)
                 
                 # Plot cluster centers
                 centers_2d = pca.transform(self.kmeans.cluster_centers_)
@@ -360,7 +500,7 @@ class WiresharkKmeansAnalyzer:
                 plt.grid(True, alpha=0.3)
                 
                 pca_file = os.path.join(output_dir, 'kmeans_pca_clusters.png')
-                plt.savefig(pca_file, dpi=300, bbox_inches='tight')
+                plt.savefig(pca_file, dpi=PLOT_DPI, bbox_inches='tight')
                 generated_files.append(pca_file)
                 print(f"📊 Generated PCA cluster plot: {pca_file}")
                 
@@ -370,15 +510,10 @@ class WiresharkKmeansAnalyzer:
             feature_names = self.features.columns
             if len(feature_names) > 1:
                 # Calculate feature importance based on variance across clusters
-                cluster_means = []
-                for i in range(self.n_clusters):
-                    cluster_mask = self.cluster_labels == i
-                    if np.sum(cluster_mask) > 0:
-                        cluster_mean = self.features[cluster_mask].mean()
-                        cluster_means.append(cluster_mean)
+                # (one grouped pass computes every cluster's mean)
+                cluster_means_df = self.features.groupby(self.cluster_labels).mean()
                 
-                if cluster_means:
-                    cluster_means_df = pd.DataFrame(cluster_means)
+                if len(cluster_means_df) > 0:
                     feature_variance = cluster_means_df.var().sort_values(ascending=False)
                     
                     plt.figure(figsize=(12, 8))
@@ -394,7 +529,7 @@ class WiresharkKmeansAnalyzer:
                     
                     plt.tight_layout()
                     feature_file = os.path.join(output_dir, 'kmeans_feature_importance.png')
-                    plt.savefig(feature_file, dpi=300, bbox_inches='tight')
+                    plt.savefig(feature_file, dpi=PLOT_DPI, bbox_inches='tight')
                     generated_files.append(feature_file)
                     print(f"📊 Generated feature importance plot: {feature_file}")
                     
@@ -407,7 +542,7 @@ class WiresharkKmeansAnalyzer:
             plt.subplot(1, 2, 1)
             packet_numbers = range(1, len(self.anomaly_scores) + 1)
             plt.plot(packet_numbers, self.anomaly_scores, alpha=0.7, linewidth=1)
-            anomaly_threshold = np.percentile(self.anomaly_scores, 90)
+            anomaly_threshold = self.anomaly_threshold
             plt.axhline(y=anomaly_threshold, color='red', linestyle='--', 
                        label=f'Anomaly Threshold (90th percentile)')
             
@@ -417,7 +552,7 @@ class WiresharkKmeansAnalyzer:
                 anomaly_packets = np.array(packet_numbers)[anomaly_mask]
                 anomaly_values = self.anomaly_scores[anomaly_mask]
                 plt.scatter(anomaly_packets, anomaly_values, color='red', s=50, 
-                           label=f'Anomalies ({np.sum(anomaly_mask)})')
+                           label=f'Anomalies ({np.sum(anomaly_mask)})', rasterized=True)
             
             plt.xlabel('Packet Number')
             plt.ylabel('Anomaly Score')
@@ -428,8 +563,9 @@ class WiresharkKmeansAnalyzer:
             # Plot 2: Packet length vs anomaly score
             plt.subplot(1, 2, 2)
             if 'length' in self.features.columns:
-                plt.scatter(self.features['length'], self.anomaly_scores, 
-                           c=self.cluster_labels, cmap='viridis', alpha=0.6)
+                plot_idx = sample_indices(len(self.anomaly_scores), PLOT_SAMPLE_SIZE)
+                plt.scatter(self.features['length'].to_numpy()[plot_idx], self.anomaly_scores[plot_idx], 
+                           c=self.cluster_labels[plot_idx], cmap='viridis', alpha=0.6, rasterized=True)
                 plt.xlabel('Packet Length')
                 plt.ylabel('Anomaly Score')
                 plt.title('Packet Length vs Anomaly Score', fontweight='bold')
@@ -438,7 +574,7 @@ class WiresharkKmeansAnalyzer:
             
             plt.tight_layout()
             anomaly_file = os.path.join(output_dir, 'kmeans_anomaly_analysis.png')
-            plt.savefig(anomaly_file, dpi=300, bbox_inches='tight')
+            plt.savefig(anomaly_file, dpi=PLOT_DPI, bbox_inches='tight')
             generated_files.append(anomaly_file)
             print(f"📊 Generated anomaly analysis plot: {anomaly_file}")
             
@@ -495,7 +631,7 @@ class WiresharkKmeansAnalyzer:
             print("💡 You can manually open the PNG files in the current directory")
     
     def export_results(self, output_file, format='json'):
-        """Export analysis results"""
+        """Export analysis results (the returned dict carries packet_results for JSON exports only)"""
         if self.cluster_labels is None:
             raise ValueError("No analysis results to export")
         
@@ -504,32 +640,33 @@ class WiresharkKmeansAnalyzer:
         # Create detailed results
         results = {
             'analysis_timestamp': datetime.now().isoformat(),
-            'summary': summary,
-            'packet_results': []
+            'summary': summary
         }
         
-        # Add per-packet results
-        for i in range(len(self.cluster_labels)):
-            packet_result = {
-                'packet_number': i + 1,
-                'cluster_id': int(self.cluster_labels[i]),
-                'anomaly_score': float(self.anomaly_scores[i]),
-                'is_anomaly': bool(self.anomaly_scores[i] > np.percentile(self.anomaly_scores, 90))
-            }
-            results['packet_results'].append(packet_result)
+        # Per-packet results as columns; only the JSON export needs them as per-packet records
+        packet_df = pd.DataFrame({
+            'packet_number': np.arange(1, len(self.cluster_labels) + 1),
+            'cluster_id': self.cluster_labels,
+            'anomaly_score': self.anomaly_scores,
+            'is_anomaly': self.anomaly_scores > self.anomaly_threshold
+        })
         
         # Export based on format
         if format.lower() == 'json':
-            with open(output_file, 'w') as f:
-                json.dump(results, f, indent=2)
+            results['packet_results'] = packet_df.to_dict(orient='records')
+            if ORJSON_AVAILABLE:
+                with open(output_file, 'wb') as f:
+                    f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(output_file, 'w') as f:
+                    json.dump(results, f, indent=2)
         elif format.lower() == 'csv':
             # Export packet results as CSV
-            packet_df = pd.DataFrame(results['packet_results'])
             packet_df.to_csv(output_file, index=False)
         
         return results
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Enhanced Wireshark K-means Backend Analyzer')
     parser.add_argument('csv_file', help='Path to Wireshark CSV export')
     parser.add_argument('--clusters', '-c', type=int, default=5, help='Number of clusters')
@@ -542,35 +679,43 @@ def main():
     parser.add_argument('--auto-open', action='store_true', default=True, help='Automatically open graphs in default viewer')
     parser.add_argument('--no-auto-open', action='store_true', help='Do not automatically open graphs')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Initialize analyzer
         analyzer = WiresharkKmeansAnalyzer(n_clusters=args.clusters)
         
-        # Process CSV file
+        # Process CSV file; very large exports are streamed in chunks to bound memory
         print(f"Processing Wireshark CSV: {args.csv_file}")
-        df = analyzer.process_wireshark_csv(args.csv_file)
-        
-        if df is None:
-            print("Error: Could not process CSV file")
-            return 1
-        
-        if len(df) == 0:
-            print("Error: CSV file is empty")
-            return 1
-        
-        # Extract features
-        print("Extracting features...")
-        features = analyzer.extract_features(df)
-        
-        if len(features) < args.clusters:
-            print(f"Error: Not enough packets ({len(features)}) for {args.clusters} clusters")
-            return 1
-        
-        # Perform analysis
-        print(f"Performing K-means analysis with {args.clusters} clusters...")
-        results = analyzer.perform_analysis(features)
+        features = None
+        if os.path.isfile(args.csv_file) and os.path.getsize(args.csv_file) > CHUNKED_READ_BYTES:
+            print("Large export detected - extracting features in chunks...")
+            features = analyzer.extract_features_chunked(args.csv_file)
+        
+        if features is not None:
+            if len(features) < args.clusters:
+                print(f"Error: Not enough packets ({len(features)}) for {args.clusters} clusters")
+                return 1
+            
+            print(f"Performing K-means analysis with {args.clusters} clusters...")
+            results = analyzer.perform_analysis(features)
+        else:
+            df = analyzer.process_wireshark_csv(args.csv_file)
+            
+            if df is None:
+                print("Error: Could not process CSV file")
+                return 1
+            
+            if len(df) == 0:
+                print("Error: CSV file is empty")
+                return 1
+            
+            if len(df) < args.clusters:
+                print(f"Error: Not enough packets ({len(df)}) for {args.clusters} clusters")
+                return 1
+            
+            # Extract features and perform analysis
+            results = analyzer.analyze(df)
         
         # Get summary
         summary = analyzer.get_cluster_summary()
@@ -10,16 +10,84 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import argparse
+import importlib.util
 import os
 import re
-from sklearn.cluster import KMeans
+import socket
+import struct
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.decomposition import PCA
 from collections import Counter
 
-def parse_arguments():
+# pyarrow provides a multi-threaded CSV reader for loading exports; pandas imports it itself
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Captures larger than this are clustered with MiniBatchKMeans
+MINIBATCH_THRESHOLD = 50000
+
+# Numerical features used for clustering
+NUMERICAL_FEATURES = ['Length', 'time_delta', 'src_local', 'dst_local',
+                      'protocol_num', 'has_error', 'is_syn', 'is_fin', 'is_dns']
+
+# Packet columns read by the cluster and anomaly reports
+ANALYSIS_COLUMNS = ['Protocol', 'Source', 'Destination', 'Length', 'Info', 'has_error']
+
+# Larger captures are randomly subsampled for the PCA projection and scatter plot
+PLOT_SAMPLE_SIZE = 50000
+
+# Exports are streamed in chunks of this many rows when a sample is requested
+SAMPLE_CHUNK_SIZE = 200000
+
+# Map common protocols to numeric values for clustering
+PROTOCOL_MAP = {
+    'TCP': 1,
+    'UDP': 2,
+    'ICMP': 3,
+    'HTTP': 4,
+    'HTTPS': 5,
+    'DNS': 6,
+    'TLS': 7,
+    'TLSv1.2': 7,
+    'TLSv1.3': 7
+}
+PROTOCOL_INDEX = pd.Index(list(PROTOCOL_MAP))
+PROTOCOL_VALUES = np.array(list(PROTOCOL_MAP.values()) + [0], dtype=np.int8)
+
+# Info-field patterns, compiled once at import
+ERROR_INFO_RE = re.compile(r'error|reset|refused|failed|timeout', re.IGNORECASE)
+SYN_INFO_RE = re.compile(r'\[SYN\]')
+FIN_INFO_RE = re.compile(r'\[FIN')
+DNS_INFO_RE = re.compile(r'Standard query|response')
+
+def ipv4_to_u32(addresses):
+    """Convert a Series of dotted-quad strings to uint32 (0 for non-IPv4 values)"""
+    # Parse each distinct address once and broadcast back through the codes
+    codes, uniques = pd.factorize(addresses)
+    values = np.zeros(len(uniques) + 1, dtype=np.uint32)
+    for i, addr in enumerate(uniques):
+        try:
+            values[i] = struct.unpack('!I', socket.inet_pton(socket.AF_INET, str(addr)))[0]
+        except (OSError, ValueError):
+            pass
+    # Missing values get code -1, which indexes the trailing zero
+    return values[codes]
+
+def is_local_ipv4(ips):
+    """Return a uint8 mask of addresses in 10.0.0.0/8, 172.16.0.0/16 or 192.168.0.0/16"""
+    return (((ips & 0xFF000000) == 0x0A000000) |
+            ((ips & 0xFFFF0000) == 0xAC100000) |
+            ((ips & 0xFFFF0000) == 0xC0A80000)).astype(np.uint8)
+
+def sample_indices(n, max_size, seed=42):
+    """Sorted random row indices (at most max_size) for plotting large captures"""
+    if n <= max_size:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, size=max_size, replace=False))
+
+def parse_arguments(argv=None):
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Analyze Wireshark CSV exports using K-means clustering')
     
@@ -36,8 +104,10 @@ def parse_arguments():
                       help='Sample size to use (for large captures)')
     parser.add_argument('--verbose', '-v', action='store_true',
                       help='Enable verbose output')
+    parser.add_argument('--cache', action='store_true',
+                      help='Cache extracted features as Parquet next to the CSV for faster repeat runs (requires pyarrow)')
                         
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # If both positional and --file are provided, positional takes precedence
     # If neither is provided, show error
@@ -50,6 +120,46 @@ def parse_arguments():
         
     return args
 
+def read_capture_csv(file_path, encoding):
+    """Read a Wireshark CSV export, using the pyarrow engine when it can parse the file"""
+    if PYARROW_AVAILABLE:
+        try:
+            df = pd.read_csv(file_path, engine='pyarrow', encoding=encoding)
+            # pyarrow keeps undecodable text as raw bytes instead of raising; such files
+            # go through the default parser so the next encoding is tried
+            if not any(isinstance(df[col].loc[df[col].first_valid_index()], bytes)
+                       for col in df.columns if df[col].dtype == object and df[col].notna().any()):
+                return df
+        except pd.errors.ParserError:
+            # Malformed rows: let the default parser report them
+            pass
+    
+    return pd.read_csv(file_path, quoting=1, encoding=encoding)  # QUOTE_ALL mode to handle Wireshark's CSV format
+
+def read_capture_sample(file_path, encoding, sample_size, chunksize=SAMPLE_CHUNK_SIZE):
+    """Uniformly sample packets from a Wireshark CSV export while reading it in chunks.
+    
+    Every packet gets a random key and the sample_size smallest keys are kept, so only the
+    current sample and one chunk are held in memory. Returns the sample and the total packet count.
+    """
+    rng = np.random.default_rng(42)
+    sample, sample_keys = None, np.empty(0)
+    total_packets = 0
+    
+    for chunk in pd.read_csv(file_path, quoting=1, encoding=encoding, chunksize=chunksize):
+        total_packets += len(chunk)
+        keys = np.concatenate([sample_keys, rng.random(len(chunk))])
+        if sample is not None:
+            chunk = pd.concat([sample, chunk])
+        keep = np.argsort(keys, kind='stable')[:sample_size]
+        sample, sample_keys = chunk.iloc[keep], keys[keep]
+    
+    # Small captures are kept whole, in their original packet order
+    if total_packets <= sample_size:
+        sample = sample.sort_index()
+    
+    return sample, total_packets
+
 def load_wireshark_csv(file_path, sample_size=None):
     """Load and preprocess a Wireshark CSV export file"""
     print(f"Loading Wireshark capture from {file_path}...")
@@ -69,8 +179,12 @@ def load_wireshark_csv(file_path, sample_size=None):
     
     for encoding in encodings:
         try:
-            # Read the CSV file with the current encoding
-            df = pd.read_csv(file_path, quoting=1, encoding=encoding)  # QUOTE_ALL mode to handle Wireshark's CSV format
+            # Read the CSV file with the current encoding; samples are drawn while streaming
+            # so large captures are never fully loaded
+            if sample_size:
+                df, total_packets = read_capture_sample(file_path, encoding, sample_size)
+            else:
+                df = read_capture_csv(file_path, encoding)
             print(f"Successfully loaded using {encoding} encoding")
             
             # Verify that the file appears to be a Wireshark CSV export
@@ -86,9 +200,8 @@ def load_wireshark_csv(file_path, sample_size=None):
                     print("Too many required columns missing. Is this a Wireshark CSV export?")
                     return None
             
-            if sample_size and len(df) > sample_size:
-                print(f"Sampling {sample_size} packets from {len(df)} total packets")
-                df = df.sample(sample_size, random_state=42)
+            if sample_size and total_packets > sample_size:
+                print(f"Sampling {sample_size} packets from {total_packets} total packets")
             
             print(f"Loaded {len(df)} packets")
             return df
@@ -107,117 +220,133 @@ def load_wireshark_csv(file_path, sample_size=None):
     print("Failed to load CSV with any of the attempted encodings")
     return None
 
-def extract_ip_features(df):
-    """Extract features from IP addresses"""
-    features = df.copy()
+def extract_ip_features(df, copy=True):
+    """Extract features from IP addresses (copy=False adds the columns to df in place)"""
+    features = df.copy() if copy else df
     
-    # Extract source IP features
-    features['src_local'] = features['Source'].apply(
-        lambda x: 1 if re.match(r'^(10\.|172\.16\.|192\.168\.)', str(x)) else 0
-    )
+    # Extract source IP features (addresses parsed to uint32, then tested with prefix masks)
+    features['src_local'] = is_local_ipv4(ipv4_to_u32(features['Source']))
     
     # Extract destination IP features
-    features['dst_local'] = features['Destination'].apply(
-        lambda x: 1 if re.match(r'^(10\.|172\.16\.|192\.168\.)', str(x)) else 0
-    )
+    features['dst_local'] = is_local_ipv4(ipv4_to_u32(features['Destination']))
     
     return features
 
-def extract_protocol_features(df):
-    """Extract features from protocol information"""
-    features = df.copy()
-    
-    # Map common protocols to numeric values for clustering
-    protocol_map = {
-        'TCP': 1,
-        'UDP': 2,
-        'ICMP': 3,
-        'HTTP': 4,
-        'HTTPS': 5,
-        'DNS': 6,
-        'TLS': 7,
-        'TLSv1.2': 7,
-        'TLSv1.3': 7
-    }
-    
-    # Extract basic protocol
-    features['protocol_num'] = features['Protocol'].apply(
-        lambda x: protocol_map.get(x, 0)
-    )
+def extract_protocol_features(df, copy=True):
+    """Extract features from protocol information (copy=False adds the columns to df in place)"""
+    features = df.copy() if copy else df
+    
+    # Extract basic protocol: resolve every packet against the known protocols in one hash
+    # lookup, then index the numeric values (position -1, unknown protocol, hits the trailing 0)
+    protocol_codes = PROTOCOL_INDEX.get_indexer(features['Protocol'])
+    features['protocol_num'] = PROTOCOL_VALUES[protocol_codes]
     
     return features
 
-def extract_length_time_features(df):
-    """Extract features from packet length and timing"""
-    features = df.copy()
+def extract_length_time_features(df, copy=True):
+    """Extract features from packet length and timing (copy=False adds the columns to df in place)"""
+    features = df.copy() if copy else df
     
-    # Convert packet length to numeric
-    features['Length'] = pd.to_numeric(features['Length'], errors='coerce')
+    # Convert packet length to numeric, using the smallest integer type when no lengths are missing
+    features['Length'] = pd.to_numeric(features['Length'], errors='coerce', downcast='integer')
     
     # Convert time to numeric
     features['Time'] = pd.to_numeric(features['Time'], errors='coerce')
     
-    # Calculate time deltas (time between consecutive packets)
-    features['time_delta'] = features['Time'].diff().fillna(0)
+    # Calculate time deltas (time between consecutive packets) on the raw array;
+    # gaps next to missing timestamps count as 0
+    time_delta = np.ediff1d(features['Time'].to_numpy(dtype=np.float64), to_begin=0.0)
+    time_delta[np.isnan(time_delta)] = 0
+    features['time_delta'] = time_delta
     
     return features
 
-def extract_info_features(df):
-    """Extract features from the Info field"""
-    features = df.copy()
+def extract_info_features(df, copy=True):
+    """Extract features from the Info field (copy=False adds the columns to df in place)"""
+    features = df.copy() if copy else df
+    
+    info = features['Info'].astype(str)
     
     # Check if packet contains error flags
-    features['has_error'] = features['Info'].apply(
-        lambda x: 1 if re.search(r'error|reset|refused|failed|timeout', str(x).lower()) else 0
-    )
+    features['has_error'] = info.str.contains(ERROR_INFO_RE, na=False).astype(np.uint8)
     
     # Check if packet is a SYN packet (connection initiation)
-    features['is_syn'] = features['Info'].apply(
-        lambda x: 1 if re.search(r'\[SYN\]', str(x)) else 0
-    )
+    features['is_syn'] = info.str.contains(SYN_INFO_RE, na=False).astype(np.uint8)
     
     # Check if packet is a FIN packet (connection termination)
-    features['is_fin'] = features['Info'].apply(
-        lambda x: 1 if re.search(r'\[FIN', str(x)) else 0
-    )
+    features['is_fin'] = info.str.contains(FIN_INFO_RE, na=False).astype(np.uint8)
     
     # Check if packet is related to DNS
-    features['is_dns'] = features['Info'].apply(
-        lambda x: 1 if re.search(r'Standard query|response', str(x)) else 0
-    )
+    features['is_dns'] = info.str.contains(DNS_INFO_RE, na=False).astype(np.uint8)
     
     return features
 
 def prepare_features(df):
     """Prepare and combine all features for clustering"""
-    # Apply all feature extraction functions
-    df1 = extract_ip_features(df)
-    df2 = extract_protocol_features(df1)
-    df3 = extract_length_time_features(df2)
-    df4 = extract_info_features(df3)
-    
-    # Select numerical features for clustering
-    numerical_features = ['Length', 'time_delta', 'src_local', 'dst_local', 
-                         'protocol_num', 'has_error', 'is_syn', 'is_fin', 'is_dns']
-    
+    # Apply all feature extraction functions to a single copy of the packets
+    enriched_df = df.copy()
+    extract_ip_features(enriched_df, copy=False)
+    extract_protocol_features(enriched_df, copy=False)
+    extract_length_time_features(enriched_df, copy=False)
+    extract_info_features(enriched_df, copy=False)
+    
+    return select_clustering_features(enriched_df), enriched_df
+
+def select_clustering_features(enriched_df):
+    """Select the numerical clustering features from an enriched packet DataFrame"""
     # Filter to only keep valid numerical features
-    feature_df = df4[numerical_features].copy()
+    feature_df = enriched_df[NUMERICAL_FEATURES]
     
     # Fill any missing values
     feature_df = feature_df.fillna(0)
     
-    return feature_df, df4
+    return feature_df
+
+def feature_cache_path(file_path, sample_size=None):
+    """Path of the Parquet feature cache kept next to a CSV export"""
+    return f"{file_path}.feat.{sample_size or 'all'}.parquet"
+
+def load_feature_cache(file_path, sample_size=None):
+    """Load cached enriched packets for a CSV export, or None if missing or stale"""
+    cache_path = feature_cache_path(file_path, sample_size)
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(file_path):
+        return None
+    
+    try:
+        enriched_df = pd.read_parquet(cache_path)
+    except Exception as e:
+        print(f"Warning: Could not read feature cache {cache_path}: {e}")
+        return None
+    
+    print(f"Loaded {len(enriched_df)} packets with features from cache {cache_path}")
+    return enriched_df
+
+def save_feature_cache(enriched_df, file_path, sample_size=None):
+    """Write enriched packets to the Parquet feature cache for a CSV export"""
+    cache_path = feature_cache_path(file_path, sample_size)
+    try:
+        enriched_df.to_parquet(cache_path, compression='zstd')
+        print(f"Saved feature cache to {cache_path}")
+    except Exception as e:
+        print(f"Warning: Could not write feature cache {cache_path}: {e}")
 
 def perform_clustering(features_df, n_clusters=5):
     """Perform K-means clustering on the features"""
     print(f"Performing K-means clustering with {n_clusters} clusters...")
     
-    # Standardize features
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(features_df)
-    
-    # Apply K-means clustering
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    # Standardize features; float32 halves the memory traffic through the KMeans distance kernel
+    scaler = StandardScaler(copy=False)
+    scaled_features = scaler.fit_transform(np.ascontiguousarray(features_df, dtype=np.float32))
+    
+    # Apply K-means clustering (mini-batch updates for large captures)
+    if len(scaled_features) > MINIBATCH_THRESHOLD:
+        print(f"Using MiniBatchKMeans for {len(scaled_features)} packets")
+        # Keep at least ~256 samples per centroid in each mini-batch for large cluster counts
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3,
+                                 batch_size=max(4096, 256 * n_clusters),
+                                 reassignment_ratio=0.01)
+    else:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
     cluster_labels = kmeans.fit_predict(scaled_features)
     centroids = kmeans.cluster_centers_
     
@@ -225,35 +354,46 @@ def perform_clustering(features_df, n_clusters=5):
 
 def analyze_clusters(original_df, features_df, labels):
     """Analyze the characteristics of each cluster"""
-    # Add cluster labels to the original dataframe
-    df_with_clusters = original_df.copy()
-    df_with_clusters['cluster'] = labels
-    
-    n_clusters = len(np.unique(labels))
-    print(f"\nAnalysis of {n_clusters} clusters:")
+    # Add cluster labels to the columns the cluster and anomaly reports read (assign shares
+    # the existing columns rather than deep-copying them); keeping the frame slim makes every
+    # per-cluster group cheaper to materialize
+    df_with_clusters = original_df[ANALYSIS_COLUMNS].assign(cluster=labels)
+    
+    # Partition the packets by cluster in a single pass instead of one boolean mask per cluster
+    grouped = df_with_clusters.groupby('cluster', sort=True)
+    avg_lengths = grouped['Length'].mean()
+    # Per-cluster top-3 value counts for all clusters in one pass each; nlargest keeps ties
+    # in order of first appearance, as Series.value_counts does, without sorting every value
+    protocol_counts, source_counts, dest_counts = (
+        df_with_clusters.groupby(['cluster', column], sort=False).size()
+        .groupby(level='cluster', group_keys=False).nlargest(3)
+        for column in ('Protocol', 'Source', 'Destination')
+    )
+    # groupby drops missing keys, so a cluster whose values are all missing (e.g. ARP frames
+    # without IP addresses) has no counts; it gets an empty list like value_counts would give
+    no_counts = protocol_counts.iloc[:0]
+    print(f"\nAnalysis of {grouped.ngroups} clusters:")
     
-    for i in range(n_clusters):
-        cluster_data = df_with_clusters[df_with_clusters['cluster'] == i]
+    for i, cluster_data in grouped:
         print(f"\nCluster {i} ({len(cluster_data)} packets, {(len(cluster_data)/len(df_with_clusters))*100:.2f}%):")
         
         # Top protocols in this cluster
-        top_protocols = cluster_data['Protocol'].value_counts().head(3)
+        top_protocols = protocol_counts.get(i, no_counts)
         print("  Top protocols:")
         for protocol, count in top_protocols.items():
             print(f"    {protocol}: {count} packets ({(count/len(cluster_data))*100:.2f}%)")
         
         # Average packet length
-        avg_length = cluster_data['Length'].mean()
-        print(f"  Average packet length: {avg_length:.2f} bytes")
+        print(f"  Average packet length: {avg_lengths[i]:.2f} bytes")
         
         # Top source IPs
-        top_sources = cluster_data['Source'].value_counts().head(3)
+        top_sources = source_counts.get(i, no_counts)
         print("  Top source IPs:")
         for ip, count in top_sources.items():
             print(f"    {ip}: {count} packets ({(count/len(cluster_data))*100:.2f}%)")
         
         # Top destination IPs
-        top_dests = cluster_data['Destination'].value_counts().head(3)
+        top_dests = dest_counts.get(i, no_counts)
         print("  Top destination IPs:")
         for ip, count in top_dests.items():
             print(f"    {ip}: {count} packets ({(count/len(cluster_data))*100:.2f}%)")
@@ -268,9 +408,13 @@ def analyze_clusters(original_df, features_df, labels):
 
 def visualize_clusters(features, labels, centroids, output_file):
     """Visualize clusters using PCA for dimensionality reduction"""
-    # Apply PCA to reduce to 2 dimensions for visualization
+    # Apply PCA to reduce to 2 dimensions for visualization. The components are fitted on every
+    # packet (cheap with this few features) but only a random subsample of large captures is
+    # projected and drawn; the scatter cannot show more points anyway
     pca = PCA(n_components=2)
-    reduced_features = pca.fit_transform(features)
+    pca.fit(features)
+    plot_idx = sample_indices(len(features), PLOT_SAMPLE_SIZE)
+    reduced_features = pca.transform(features[plot_idx])
     reduced_centroids = pca.transform(centroids)
     
     # Set up the plot
@@ -278,7 +422,7 @@ def visualize_clusters(features, labels, centroids, output_file):
     
     # Plot data points colored by cluster
     scatter = plt.scatter(reduced_features[:, 0], reduced_features[:, 1], 
-                         c=labels, alpha=0.6, s=50, cmap='viridis')
+                         c=labels[plot_idx], alpha=0.6, s=50, cmap='viridis')
     
     # Plot centroids
     plt.scatter(reduced_centroids[:, 0], reduced_centroids[:, 1], 
@@ -313,15 +457,12 @@ def explain_pca(pca, feature_names):
     for i, component in enumerate(pca.components_):
         print(f"\nPrincipal Component {i+1}:")
         
-        # Get the feature importance for this component
-        feature_importance = list(zip(feature_names, component))
-        
-        # Sort by absolute importance
-        feature_importance.sort(key=lambda x: abs(x[1]), reverse=True)
+        # Rank features by absolute importance (stable, so ties keep feature order)
+        top_features = np.argsort(-np.abs(component), kind='stable')[:5]
         
         # Print the top contributing features
-        for feature, weight in feature_importance[:5]:
-            print(f"  {feature}: {weight:.4f}")
+        for j in top_features:
+            print(f"  {feature_names[j]}: {component[j]:.4f}")
 
 def detect_anomalies(df_with_clusters):
     """Detect potential anomalies based on cluster characteristics"""
@@ -336,8 +477,10 @@ def detect_anomalies(df_with_clusters):
     if small_clusters:
         print(f"\nSmall clusters that might contain anomalies: {small_clusters}")
         
+        # One mask over all small clusters, then split into per-cluster groups
+        small_cluster_groups = df_with_clusters[df_with_clusters['cluster'].isin(small_clusters)].groupby('cluster')
         for cluster in small_clusters:
-            cluster_data = df_with_clusters[df_with_clusters['cluster'] == cluster]
+            cluster_data = small_cluster_groups.get_group(cluster)
             print(f"\nExamining small cluster {cluster} ({len(cluster_data)} packets):")
             
             # Check if this cluster has unusual protocols
@@ -391,13 +534,13 @@ def generate_traffic_summary(df):
         print(f"  {protocol}: {count} packets ({(count/len(df))*100:.2f}%)")
     
     # Top talkers (source IPs)
-    source_counts = df['Source'].value_counts().head(5)
+    source_counts = df['Source'].value_counts(sort=False).nlargest(5)
     print("\nTop Talkers (Source IPs):")
     for ip, count in source_counts.items():
         print(f"  {ip}: {count} packets ({(count/len(df))*100:.2f}%)")
     
     # Top destinations
-    dest_counts = df['Destination'].value_counts().head(5)
+    dest_counts = df['Destination'].value_counts(sort=False).nlargest(5)
     print("\nTop Destinations:")
     for ip, count in dest_counts.items():
         print(f"  {ip}: {count} packets ({(count/len(df))*100:.2f}%)")
@@ -414,21 +557,38 @@ def generate_traffic_summary(df):
         print(f"\nCapture Duration: {duration:.2f} seconds")
         print(f"Average Packet Rate: {len(df)/duration:.2f} packets/second")
 
-def main():
+def main(argv=None):
     """Main execution function"""
     # Parse arguments
-    args = parse_arguments()
-    
-    # Load the Wireshark CSV file
-    df = load_wireshark_csv(args.file_path, args.sample)
-    if df is None:
-        return
-    
-    # Generate a basic traffic summary
-    generate_traffic_summary(df)
-    
-    # Prepare features for clustering
-    features_df, enriched_df = prepare_features(df)
+    args = parse_arguments(argv)
+    
+    if args.cache and not PYARROW_AVAILABLE:
+        print("Warning: --cache requires pyarrow; features will not be cached")
+        args.cache = False
+    
+    # Reuse features extracted by an earlier run on the same export
+    enriched_df = None
+    if args.cache and os.path.exists(args.file_path):
+        enriched_df = load_feature_cache(args.file_path, args.sample)
+    
+    if enriched_df is None:
+        # Load the Wireshark CSV file
+        df = load_wireshark_csv(args.file_path, args.sample)
+        if df is None:
+            return
+        
+        # Generate a basic traffic summary
+        generate_traffic_summary(df)
+        
+        # Prepare features for clustering; the enriched copy replaces the raw packets
+        features_df, enriched_df = prepare_features(df)
+        del df
+        if args.cache:
+            save_feature_cache(enriched_df, args.file_path, args.sample)
+    else:
+        # Generate a basic traffic summary
+        generate_traffic_summary(enriched_df)
+        features_df = select_clustering_features(enriched_df)
     
     if args.verbose:
         print("\nFeatures prepared for clustering:")